@@ -1,7 +1,14 @@
+import asyncio
+import json
 import os
+import shutil
+import string
+import sys
+from types import MappingProxyType
 from urllib.parse import urljoin, urlparse
 
 import requests
+from urllib3.util.retry import Retry
 
 from divio_cli.exceptions import DivioException
 
@@ -9,11 +16,168 @@ from . import messages
 from .utils import create_temp_dir, get_user_agent
 
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+try:
+    # requests (via urllib3) can only decode brotli when the package is
+    # installed, so only advertise it then. Brotli beats gzip by 15-25%
+    # on the large v3 JSON payloads.
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+# Sentinel for "not cached yet" (False is a valid cached login result).
+UNSET = object()
+
+# Shared read-only default for the common no-arguments case, so
+# instantiating a request in a loop doesn't allocate four empty dicts.
+_EMPTY = MappingProxyType({})
+
+# Multipart bodies for uploads larger than this are streamed from disk
+# instead of being built in memory first.
+STREAMING_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+
+
+def _file_size(fileobj):
+    try:
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+_http2_client = None
+
+
+def _get_http2_client():
+    """
+    Return the shared HTTP/2 client, or None when HTTP/2 is disabled or
+    httpx is not usable.
+
+    Opt-in via DIVIO_HTTP2=1: a single multiplexed connection can carry
+    all concurrent v3 polls instead of one HTTP/1.1 connection each.
+    """
+    global _http2_client
+    if httpx is None or os.environ.get("DIVIO_HTTP2") != "1":
+        return None
+    if _http2_client is UNSET:
+        return None
+    if _http2_client is None:
+        try:
+            _http2_client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=8),
+            )
+        except ImportError:
+            # httpx is installed without its http2 extra (no h2
+            # package); remember that and stay on the requests path.
+            _http2_client = UNSET
+            return None
+    return _http2_client
+
+
+def _compile_url(url):
+    """
+    Pre-parse a URL template into (literal, field_name) parts, so
+    get_url() doesn't re-run the str.format parser on every request.
+
+    Returns None for templates without placeholders or with format specs
+    we don't handle; callers fall back to plain str.format then.
+    """
+    if not url or "{" not in url:
+        return None
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(url):
+        if spec or conversion:
+            return None
+        parts.append((literal, field))
+    return parts
+
+
+def load_json(response):
+    """
+    Decode the JSON body of a response.
+
+    Uses orjson when available: it consumes the raw UTF-8 bytes directly
+    and is considerably faster than the stdlib decoder on the large
+    payloads returned by the v3 endpoints.
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
+
+# Module-level processors shared by the response mixins. Subclasses get
+# them hoisted into their own namespace as staticmethods (see
+# APIRequest.__init_subclass__), so the hottest call path skips the MRO
+# walk and the bound-method allocation.
+def _process_json_response(response):
+    return load_json(response)
+
+
+def _process_text_response(response):
+    return response.text
+
+
+def _process_raw_response(response):
+    return response
+
+
 class SingleHostSession(requests.Session):
     def __init__(self, host, **kwargs):
         super().__init__()
         self.debug = kwargs.pop("debug", False)
         self.host = host.rstrip("/")
+        # Precomputed for the v3 compatibility hack in request().
+        self._host_api = self.host.replace("control", "api", 1)
+
+        # A larger pool keeps connections warm across polling loops
+        # (deploy progress, backup status) instead of serializing behind
+        # the default pool of 10, and transient gateway errors are
+        # retried with a short backoff.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                # Hand the final response back to verify() instead of
+                # raising RetryError once the retries are exhausted.
+                raise_on_status=False,
+            ),
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
 
         default_proxies = {}
 
@@ -35,16 +199,55 @@ class SingleHostSession(requests.Session):
             setattr(self, key, value)
 
     def request(self, method, url, v3_compatibilty=False, *args, **kwargs):
-        url = urljoin(self.host, url)
+        if url.startswith("/"):
+            # Common case: host-relative URL. Plain concatenation avoids
+            # urljoin re-parsing both sides on every request.
+            # The host swap is the V3 compatibility hack.
+            url = (self._host_api if v3_compatibilty else self.host) + url
+        else:
+            url = urljoin(self.host, url)
+            if v3_compatibilty:
+                # V3 compatibility hack
+                url = url.replace("control", "api", 1)
         if v3_compatibilty:
-            # V3 compatibility hack
-            url = url.replace("control", "api", 1)
             # All v3 endpoints support JSON, and some use nested data structures
             # that do not work with url-encoded body
-            kwargs["json"] = kwargs.pop("data", {})
+            # "or {}": the shared empty default is a mapping proxy,
+            # which the json encoder does not accept.
+            kwargs["json"] = kwargs.pop("data", None) or {}
         return super().request(method, url, *args, **kwargs)
 
 
+class UploadSession(requests.Session):
+    """
+    Session for requests that target a host other than the control host
+    (e.g. the backup upload finish URL). Accepts the same v3 compatibility
+    flag as SingleHostSession, but leaves the URL untouched.
+    """
+
+    debug = False
+
+    def __init__(self):
+        super().__init__()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=16
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, v3_compatibilty=False, *args, **kwargs):
+        if v3_compatibilty:
+            # "or {}": the shared empty default is a mapping proxy,
+            # which the json encoder does not accept.
+            kwargs["json"] = kwargs.pop("data", None) or {}
+        return super().request(method, url, *args, **kwargs)
+
+
+# Kept at module level so repeated upload calls reuse the same TCP/TLS
+# connections instead of handshaking from scratch each time.
+_upload_session = UploadSession()
+
+
 class APIRequestError(DivioException):
     pass
 
@@ -53,20 +256,62 @@ class NetworkError(DivioException):
     pass
 
 
+class BufferedResponse:
+    """
+    Minimal requests.Response stand-in wrapping an already-read response
+    body (aiohttp, httpx), so the regular verify()/process() chain can
+    be reused.
+    """
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+        self.ok = status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
 class APIRequest:
     network_exception_message = messages.NETWORK_ERROR_MESSAGE
     default_error_message = messages.SERVER_ERROR
-    response_code_error_map = {
-        requests.codes.forbidden: messages.AUTH_INVALID_TOKEN,
-        requests.codes.unauthorized: messages.AUTH_INVALID_TOKEN,
-        requests.codes.not_found: messages.RESOURCE_NOT_FOUND_ANONYMOUS,
-        requests.codes.bad_request: messages.BAD_REQUEST,
-    }
+    response_code_error_map = MappingProxyType(
+        {
+            requests.codes.forbidden: messages.AUTH_INVALID_TOKEN,
+            requests.codes.unauthorized: messages.AUTH_INVALID_TOKEN,
+            requests.codes.not_found: messages.RESOURCE_NOT_FOUND_ANONYMOUS,
+            requests.codes.bad_request: messages.BAD_REQUEST,
+        }
+    )
 
     method = "GET"
     url = None
-    default_headers = {"User-Agent": get_user_agent()}
+    default_headers = MappingProxyType(
+        {
+            "User-Agent": get_user_agent(),
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+    )
     headers = {}
+    _cached_headers = dict(default_headers)
+    _url_parts = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Merge the class-level headers once, so polling loops don't
+        # rebuild the same dict on every request.
+        cls._cached_headers = {**cls.default_headers, **cls.headers}
+        cls._url_parts = _compile_url(cls.url)
+        if "process" not in cls.__dict__ and cls.process in (
+            _process_json_response,
+            _process_text_response,
+            _process_raw_response,
+        ):
+            cls.process = staticmethod(cls.process)
 
     def __init__(
         self,
@@ -82,52 +327,109 @@ class APIRequest:
         self.session = session
         if url:
             self.url = url
-        self.url_kwargs = url_kwargs or {}
-        self.params = params or {}
-        self.data = data or {}
-        self.files = files or {}
+        self.url_kwargs = url_kwargs or _EMPTY
+        self.params = params or _EMPTY
+        self.data = data or _EMPTY
+        self.files = files or _EMPTY
 
     def __call__(self, *args, **kwargs):
         return self.request(*args, **kwargs)
 
     def get_url(self):
-        return self.url.format(**self.url_kwargs)
+        url = self.url
+        if url is not type(self).url or self._url_parts is None:
+            # Per-instance URL (e.g. a pagination "next" link) or a
+            # template we could not precompile.
+            return url.format(**self.url_kwargs) if "{" in url else url
+        return "".join(
+            literal + (str(self.url_kwargs[field]) if field else "")
+            for literal, field in self._url_parts
+        )
 
     def get_login(self):
         """Tries to get the login name for the current request"""
+        # Cached on the session: reading and parsing the netrc file on
+        # every failed response is wasteful, and the login only changes
+        # on login/logout.
+        login = getattr(self.session, "_login_cache", UNSET)
+        if login is not UNSET:
+            return login
+
         # import done here to prevent circular import
         from . import cloud
 
         netrc = cloud.WritableNetRC()
-        host = urlparse(self.session.host).hostname
+        host = urlparse(getattr(self.session, "host", "")).hostname
         data = netrc.hosts.get(host)
-        if data:
-            return data[0]
-        return False
+        login = data[0] if data else False
+        self.session._login_cache = login
+        return login
 
     def get_error_code_map(self, login=None):
-        # if a login is provided, change the errormessages accordingly
+        # if a login is provided, change the errormessages accordingly.
+        # Return a fresh dict instead of mutating the class-level map,
+        # which leaked the login-specific message into every other
+        # request class.
         if login:
-            self.response_code_error_map[
-                requests.codes.not_found
-            ] = messages.RESOURCE_NOT_FOUND.format(login=login)
+            not_found_msg = getattr(self.session, "_not_found_msg", None)
+            if not_found_msg is None:
+                not_found_msg = messages.RESOURCE_NOT_FOUND.format(
+                    login=login
+                )
+                self.session._not_found_msg = not_found_msg
+            return {
+                **self.response_code_error_map,
+                requests.codes.not_found: not_found_msg,
+            }
 
         return self.response_code_error_map
 
     def get_headers(self):
-        headers = self.default_headers.copy()
+        if self.headers is type(self).headers:
+            return self._cached_headers
+        # A caller injected per-instance headers; fall back to a fresh
+        # merge.
+        headers = dict(self.default_headers)
         headers.update(self.headers)
         return headers
 
+    def _get_multipart_encoder(self):
+        """
+        Build a streaming multipart encoder for large file uploads, or
+        return None to let requests assemble the body in memory.
+        """
+        if not self.files or MultipartEncoder is None:
+            return None
+        sizes = [_file_size(fileobj) for fileobj in self.files.values()]
+        if None in sizes or max(sizes) <= STREAMING_UPLOAD_THRESHOLD:
+            return None
+        fields = {key: str(value) for key, value in self.data.items()}
+        for name, fileobj in self.files.items():
+            filename = os.path.basename(getattr(fileobj, "name", "") or name)
+            fields[name] = (filename, fileobj)
+        return MultipartEncoder(fields=fields)
+
     def request(self, *args, **kwargs):
+        data = self.data
+        files = self.files
+        headers = self.get_headers()
+
+        encoder = self._get_multipart_encoder()
+        if encoder is not None:
+            # Stream the multipart body from disk; building it in memory
+            # peaks at roughly twice the archive size.
+            headers = dict(headers)
+            headers["Content-Type"] = encoder.content_type
+            data, files = encoder, None
+
         try:
             response = self.session.request(
                 self.method,
                 self.get_url(),
                 *args,
-                data=self.data,
-                files=self.files,
-                headers=self.get_headers(),
+                data=data,
+                files=files,
+                headers=headers,
                 params=self.params,
                 **kwargs,
             )
@@ -139,20 +441,91 @@ class APIRequest:
 
         return self.verify(response)
 
+    async def async_request(self, client=None):
+        """
+        Issue this request on an aiohttp client session and return the
+        processed result. Mainly useful through gather() to run several
+        independent requests (e.g. polling backups per service instance)
+        concurrently instead of paying one round trip each.
+        """
+        if self.files:
+            # Fail loudly rather than sending the request without its
+            # multipart payload.
+            raise DivioException(
+                "File uploads are not supported by async_request(); "
+                "use the synchronous request() instead."
+            )
+        if getattr(self.session, "host", None) is None:
+            raise DivioException(
+                "async_request() requires a session bound to a host."
+            )
+        if aiohttp is None:
+            raise DivioException(
+                "aiohttp is required for concurrent requests. "
+                "Install it with: pip install divio-cli[speedups]"
+            )
+        if client is None:
+            async with aiohttp.ClientSession() as client:
+                return await self.async_request(client)
+
+        url = urljoin(self.session.host, self.get_url())
+        headers = dict(self.session.headers)
+        headers.update(self.get_headers())
+        kwargs = {"params": self.params or None, "headers": headers}
+        if isinstance(self, APIV3Request):
+            # Same compatibility hack as SingleHostSession.request
+            url = url.replace("control", "api", 1)
+            kwargs["json"] = dict(self.data)
+        elif self.data:
+            kwargs["data"] = self.data
+
+        try:
+            async with client.request(self.method, url, **kwargs) as response:
+                content = await response.read()
+                status = response.status
+        except aiohttp.ClientError as e:
+            raise NetworkError(messages.NETWORK_ERROR_MESSAGE + str(e))
+
+        return self.verify(BufferedResponse(status, content))
+
+    @staticmethod
+    def gather(api_requests):
+        """
+        Run several API requests concurrently over a shared connection
+        pool and return their processed results in order.
+        """
+        if aiohttp is None:
+            raise DivioException(
+                "aiohttp is required for concurrent requests. "
+                "Install it with: pip install divio-cli[speedups]"
+            )
+
+        async def _gather():
+            connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+            async with aiohttp.ClientSession(connector=connector) as client:
+                return await asyncio.gather(
+                    *[request.async_request(client) for request in api_requests]
+                )
+
+        return asyncio.run(_gather())
+
     def verify(self, response):
         if not response.ok:
             error_msg = self.get_error_code_map(self.get_login()).get(
                 response.status_code, self.default_error_message
             )
-            response_content = response.text
+            raw = response.content
             if not self.session.debug:
-                response_content = response_content[:300]
+                # Only a short excerpt is shown anyway; don't decode the
+                # full body (5xx error pages can be hundreds of KB).
+                raw = raw[:300]
+            response_content = raw.decode("utf-8", errors="replace")
             if response_content:
                 # Try to extract all errors separately and build a prettified error message.
                 # non_field_errors is the default key our APIs are using for returning such errors.
                 try:
                     non_field_errors = "\n".join(
-                        list(response.json()["non_field_errors"])
+                        list(load_json(response)["non_field_errors"])
                     )
                     error_msg = f"{error_msg}\n\n{non_field_errors}"
                 # Must keep this generic due to compatibility issues of requests library for json decode exceptions.
@@ -167,22 +540,94 @@ class APIRequest:
 
 class APIV3Request(APIRequest):
     def request(self, *args, **kwargs):
+        client = _get_http2_client()
+        # Only plain requests against the control host can be
+        # multiplexed; sessions without a host (UploadSession) and calls
+        # with extra arguments (stream=True, timeouts, ...) stay on the
+        # requests path rather than being silently dropped.
+        if (
+            client is not None
+            and not args
+            and not kwargs
+            and getattr(self.session, "host", None)
+        ):
+            return self._http2_request(client)
         return super().request(*args, v3_compatibilty=True, **kwargs)
 
+    def _http2_request(self, client):
+        url = self.get_url()
+        if url.startswith("/"):
+            url = self.session._host_api + url
+        else:
+            # Same rewrite as SingleHostSession.request applies to
+            # absolute URLs (pagination "next" links).
+            url = urljoin(self.session.host, url).replace(
+                "control", "api", 1
+            )
+        headers = dict(self.session.headers)
+        headers.update(self.get_headers())
+        try:
+            response = client.request(
+                self.method,
+                url,
+                headers=headers,
+                params=dict(self.params) or None,
+                json=dict(self.data),
+            )
+        except httpx.HTTPError as e:
+            raise NetworkError(messages.NETWORK_ERROR_MESSAGE + str(e))
+        return self.verify(
+            BufferedResponse(response.status_code, response.content)
+        )
+
 
 class RawResponse:
-    def process(self, response):
-        return response
+    process = staticmethod(_process_raw_response)
 
 
 class TextResponse:
-    def process(self, response):
-        return response.text
+    process = staticmethod(_process_text_response)
 
 
 class JsonResponse:
+    process = staticmethod(_process_json_response)
+
+
+class StreamingJsonResponse:
+    """
+    Yields the items of a paginated JSON response one by one as the body
+    arrives, instead of buffering and decoding the whole payload first.
+
+    Useful for the log and deployment endpoints, where payloads can reach
+    megabytes but the caller only iterates the 'results' array: memory
+    stays at one record and the first item is available after a single
+    round trip. Falls back to buffered decoding when ijson is not
+    installed. Note that the pagination metadata ('count', 'next') is not
+    part of the stream.
+    """
+
+    json_items_path = "results.item"
+
     def process(self, response):
-        return response.json()
+        if ijson is None:
+            return iter(load_json(response).get("results", []))
+        # Streamed responses are left undecoded by requests; ijson must
+        # see decoded bytes when the server applied Content-Encoding
+        # (the mirror of FileResponse forcing decoding off).
+        response.raw.decode_content = True
+        return self._iter_items(response)
+
+    def _iter_items(self, response):
+        try:
+            yield from ijson.items(response.raw, self.json_items_path)
+        finally:
+            # Release the connection back to the pool even when the
+            # consumer stops iterating early.
+            response.close()
+
+    def request(self, *args, **kwargs):
+        kwargs["stream"] = True
+        return super().request(*args, **kwargs)
 
 
 class DjangoFormMixin:
@@ -196,7 +641,7 @@ class DjangoFormMixin:
                 "There was an error submitting your request:\n"
                 "-------------------------------------------\n\n"
             )
-            for field, errors in response.json().items():
+            for field, errors in load_json(response).items():
                 formatted += f" - {field}\n"
                 for error in errors:
                     formatted += f"   - {error}\n"
@@ -206,21 +651,45 @@ class DjangoFormMixin:
 
 
 class FileResponse:
+    # Large chunks keep the download I/O-bound instead of burning CPU on
+    # syscall overhead for multi-GB backups.
+    chunk_size = 256 * 1024
+    # Coalesce writes into multi-MiB batches before they hit the kernel.
+    write_buffer_size = 4 * 1024 * 1024
+
     def __init__(self, *args, **kwargs):
         self.filename = kwargs.pop("filename", None)
         self.directory = kwargs.pop("directory", None)
         super().__init__(*args, **kwargs)
 
     def process(self, response):
+        # The dump is a compressed archive as-is; skip the
+        # content-decoding machinery and the iter_content generator
+        # and copy straight from the underlying stream.
+        response.raw.decode_content = False
+
+        if self.filename == "-" or self.directory == "-":
+            # Pipe the archive straight to the consumer (tar, gpg, ...)
+            # instead of taking a round-trip through the disk.
+            stdout = sys.stdout.buffer
+            shutil.copyfileobj(response.raw, stdout, length=self.chunk_size)
+            stdout.flush()
+            return "-"
+
         dump_path = os.path.join(
             self.directory or create_temp_dir(), self.filename or "data.tar.gz"
         )
 
-        with open(dump_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:  # filter out keep-alive new chunks
-                    f.write(chunk)
-                    f.flush()
+        with open(dump_path, "wb", buffering=self.write_buffer_size) as f:
+            shutil.copyfileobj(response.raw, f, length=self.chunk_size)
+            f.flush()
+            if hasattr(os, "posix_fadvise"):
+                # The dump is handed off to other tools (or nothing at
+                # all); tell the kernel not to keep a multi-GB archive
+                # in the page cache at the expense of hot pages.
+                os.posix_fadvise(
+                    f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED
+                )
         return dump_path
 
     def request(self, *args, **kwargs):
@@ -335,8 +804,10 @@ class FinishBackupUploadRequest(JsonResponse, APIV3Request):
     method = "POST"
 
     def __init__(self, session, *args, **kwargs):
-        # Do not use session, just a simple requests.request() call.
-        super().__init__(requests, *args, **kwargs)
+        # Do not use the control host session: the upload URL points to a
+        # different host. Use the shared upload session instead, which
+        # keeps connections alive across calls.
+        super().__init__(_upload_session, *args, **kwargs)
 
 
 class CreateBackupRestoreRequest(JsonResponse, APIV3Request):
@@ -128,6 +128,8 @@ class CloudClient:
 
         self.netrc.add(urlparse(self.endpoint).hostname, email, None, token)
         self.netrc.write()
+        self.session._login_cache = api_requests.UNSET
+        self.session._not_found_msg = None
 
         return messages.LOGIN_SUCCESSFUL.format(greeting=greeting)
 
@@ -156,6 +158,8 @@ class CloudClient:
 
         self.netrc.remove(host)
         self.netrc.write()
+        self.session._login_cache = api_requests.UNSET
+        self.session._not_found_msg = None
 
         secho(messages.LOGOUT_SUCCESS.format(host))
 
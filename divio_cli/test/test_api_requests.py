@@ -0,0 +1,283 @@
+import asyncio
+import gzip
+import io
+import json
+from unittest.mock import Mock
+
+import pytest
+import requests
+import urllib3
+
+from divio_cli import api_requests
+from divio_cli.exceptions import DivioException
+
+
+class FakeRaw(io.BytesIO):
+    """BytesIO stand-in for response.raw that accepts attributes."""
+
+
+def make_response(content=b"{}", status_code=200, ok=True):
+    response = Mock()
+    response.content = content
+    response.status_code = status_code
+    response.ok = ok
+    try:
+        response.json = Mock(return_value=json.loads(content))
+    except ValueError:
+        pass
+    return response
+
+
+def test_load_json_decodes_bytes():
+    response = make_response(content=b'{"results": [1, 2, 3]}')
+    assert api_requests.load_json(response) == {"results": [1, 2, 3]}
+
+
+def test_get_headers_is_cached_per_class():
+    request = api_requests.DownloadBackupRequest(
+        Mock(), url_kwargs={"website_slug": "slug"}
+    )
+    headers = request.get_headers()
+    assert headers["accept"] == "application/x-tar-gz"
+    assert "User-Agent" in headers
+    # The merged class-level headers are computed once and reused.
+    assert request.get_headers() is headers
+
+
+def test_get_headers_with_instance_headers():
+    request = api_requests.ProjectListRequest(Mock())
+    request.headers = {"X-Custom": "1"}
+    headers = request.get_headers()
+    assert headers["X-Custom"] == "1"
+    assert "User-Agent" in headers
+    # Class-level cache must not pick up instance headers.
+    assert "X-Custom" not in api_requests.ProjectListRequest(
+        Mock()
+    ).get_headers()
+
+
+def test_single_host_session_url_building(monkeypatch):
+    captured = {}
+
+    def fake_request(self, method, url, *args, **kwargs):
+        captured["url"] = url
+        return Mock()
+
+    monkeypatch.setattr(requests.Session, "request", fake_request)
+    session = api_requests.SingleHostSession("https://control.divio.com")
+
+    session.request("GET", "/api/v1/user-websites/")
+    assert captured["url"] == "https://control.divio.com/api/v1/user-websites/"
+
+    session.request("GET", "/apps/v3/backups/", v3_compatibilty=True)
+    assert captured["url"] == "https://api.divio.com/apps/v3/backups/"
+
+    # Absolute URLs (pagination "next" links) pass through unchanged.
+    next_link = "https://api.divio.com/apps/v3/deployments/?page=2"
+    session.request("GET", next_link, v3_compatibilty=True)
+    assert captured["url"] == next_link
+
+
+def test_no_arg_requests_share_empty_defaults():
+    first = api_requests.ProjectListRequest(Mock())
+    second = api_requests.ProjectListRequest(Mock())
+    assert first.params is second.params
+    assert first.data is second.data
+    # The shared default must be read-only.
+    with pytest.raises(TypeError):
+        first.params["key"] = "value"
+
+
+def test_get_url_with_url_kwargs():
+    request = api_requests.GetBackupRequest(
+        Mock(), url_kwargs={"backup_uuid": "1234"}
+    )
+    assert request.get_url() == "/apps/v3/backups/1234/"
+
+
+def test_get_url_without_placeholders():
+    request = api_requests.ProjectListRequest(Mock())
+    assert request.get_url() == "/api/v1/user-websites/"
+
+
+def test_get_url_with_instance_url():
+    # Pagination follows absolute "next" links passed at instantiation.
+    request = api_requests.DeploymentsRequest(
+        Mock(), url="https://api.divio.com/apps/v3/deployments/?page=2"
+    )
+    assert (
+        request.get_url() == "https://api.divio.com/apps/v3/deployments/?page=2"
+    )
+
+
+def test_get_error_code_map_does_not_mutate_class_map():
+    session = Mock(_not_found_msg=None)
+    request = api_requests.ProjectListRequest(session)
+
+    error_map = request.get_error_code_map(login="user@example.com")
+    assert "user@example.com" in error_map[404]
+    # The class-level map must stay untouched for other sessions.
+    assert (
+        api_requests.APIRequest.response_code_error_map[404]
+        == error_map[404]
+    ) is False
+
+
+class StreamingLogRequest(
+    api_requests.StreamingJsonResponse, api_requests.APIV3Request
+):
+    url = "/apps/v3/environments/{environment_uuid}/logs/"
+
+
+def test_streaming_json_response_yields_results():
+    request = StreamingLogRequest(
+        Mock(), url_kwargs={"environment_uuid": "uuid"}
+    )
+    payload = b'{"count": 2, "next": null, "results": [{"line": 1}, {"line": 2}]}'
+    response = make_response(content=payload)
+    response.raw = FakeRaw(payload)
+    assert list(request.process(response)) == [{"line": 1}, {"line": 2}]
+
+
+def test_streaming_json_response_decodes_gzip_stream():
+    pytest.importorskip("ijson")
+
+    request = StreamingLogRequest(
+        Mock(), url_kwargs={"environment_uuid": "uuid"}
+    )
+    payload = b'{"count": 1, "next": null, "results": [{"line": 1}]}'
+    response = Mock()
+    response.raw = urllib3.response.HTTPResponse(
+        body=io.BytesIO(gzip.compress(payload)),
+        headers={"content-encoding": "gzip"},
+        status=200,
+        preload_content=False,
+        decode_content=False,
+    )
+
+    assert list(request.process(response)) == [{"line": 1}]
+    # The connection is released once the stream is exhausted.
+    response.close.assert_called_once()
+
+
+def test_async_request_rejects_file_uploads():
+    request = api_requests.UploadAddonRequest(
+        Mock(), files={"app": io.BytesIO(b"archive")}
+    )
+    with pytest.raises(DivioException) as excinfo:
+        asyncio.run(request.async_request())
+    assert "not supported" in str(excinfo.value)
+
+
+def test_async_request_rejects_hostless_sessions():
+    # FinishBackupUploadRequest runs on the hostless upload session.
+    request = api_requests.FinishBackupUploadRequest(Mock())
+    with pytest.raises(DivioException) as excinfo:
+        asyncio.run(request.async_request())
+    assert "host" in str(excinfo.value)
+
+
+def test_http2_client_falls_back_when_h2_is_missing(monkeypatch):
+    class FakeHttpx:
+        class Limits:
+            def __init__(self, **kwargs):
+                pass
+
+        class Client:
+            def __init__(self, **kwargs):
+                raise ImportError(
+                    "Using http2=True, but the 'h2' package is not installed"
+                )
+
+    monkeypatch.setattr(api_requests, "httpx", FakeHttpx)
+    monkeypatch.setattr(api_requests, "_http2_client", None)
+    monkeypatch.setenv("DIVIO_HTTP2", "1")
+
+    assert api_requests._get_http2_client() is None
+    # The failure is remembered instead of re-raising on every request.
+    assert api_requests._http2_client is api_requests.UNSET
+    assert api_requests._get_http2_client() is None
+
+
+def test_verify_extracts_non_field_errors():
+    request = api_requests.ProjectListRequest(
+        Mock(debug=False, _login_cache=False, _not_found_msg=None)
+    )
+    response = make_response(
+        content=b'{"non_field_errors": ["boom"]}', status_code=400, ok=False
+    )
+    with pytest.raises(api_requests.APIRequestError) as excinfo:
+        request.verify(response)
+    assert "boom" in str(excinfo.value)
+
+
+def test_verify_truncates_error_body_when_not_in_debug():
+    request = api_requests.ProjectListRequest(
+        Mock(debug=False, _login_cache=False, _not_found_msg=None)
+    )
+    response = make_response(
+        content=b"<html>" + b"x" * 5000, status_code=500, ok=False
+    )
+    with pytest.raises(api_requests.APIRequestError) as excinfo:
+        request.verify(response)
+    assert len(str(excinfo.value)) < 1000
+
+
+def test_file_response_process_writes_raw_stream(tmp_path):
+    request = api_requests.DownloadBackupRequest(
+        Mock(),
+        url_kwargs={"website_slug": "slug"},
+        directory=str(tmp_path),
+    )
+    response = Mock()
+    response.raw = FakeRaw(b"archive-bytes")
+
+    dump_path = request.process(response)
+
+    assert dump_path == str(tmp_path / "data.tar.gz")
+    with open(dump_path, "rb") as f:
+        assert f.read() == b"archive-bytes"
+
+
+def test_process_is_hoisted_onto_subclasses():
+    # The mixin processor is copied into the subclass namespace as a
+    # staticmethod, while explicit overrides stay untouched.
+    assert "process" in api_requests.GetBackupRequest.__dict__
+    assert (
+        api_requests.SlugToIDRequest.__dict__["process"]
+        is not api_requests.JsonResponse.__dict__["process"]
+    )
+    response = make_response(content=b'{"id": 42}')
+    assert api_requests.SlugToIDRequest(Mock()).process(response) == 42
+
+
+def test_file_response_process_writes_to_stdout(capsysbinary):
+    request = api_requests.DownloadBackupRequest(
+        Mock(), url_kwargs={"website_slug": "slug"}, filename="-"
+    )
+    response = Mock()
+    response.raw = FakeRaw(b"archive-bytes")
+
+    assert request.process(response) == "-"
+    assert capsysbinary.readouterr().out == b"archive-bytes"
+
+
+def test_buffered_response():
+    response = api_requests.BufferedResponse(200, b'{"count": 0}')
+    assert response.ok
+    assert response.json() == {"count": 0}
+    assert response.text == '{"count": 0}'
+
+    response = api_requests.BufferedResponse(404, b"not found")
+    assert not response.ok
+
+
+def test_json_response_process():
+    request = api_requests.GetBackupRequest(
+        Mock(), url_kwargs={"backup_uuid": "uuid"}
+    )
+    response = make_response(content=b'{"uuid": "uuid", "state": "COMPLETED"}')
+    assert request.process(response) == {
+        "uuid": "uuid",
+        "state": "COMPLETED",
+    }